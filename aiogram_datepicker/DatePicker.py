@@ -3,6 +3,7 @@ from datetime import date, timedelta
 from typing import Callable, Literal, Optional
 
 from aiogram import F, Router
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.fsm.context import FSMContext
 from aiogram.types import (
     CallbackQuery,
@@ -11,8 +12,70 @@ from aiogram.types import (
     Message,
 )
 
+_MONTH_OUTSIDE, _MONTH_PARTIAL, _MONTH_INSIDE = 0, 1, 2
+
+# Step mode prebuilds month keyboards in __init__ for ranges up to this many
+# years; longer ranges build them on first use to keep construction cheap.
+_PREBUILT_YEARS_LIMIT = 10
+
+# Number of chats whose last shown inline month is remembered; the oldest
+# entry is dropped first, since abandoned calendars never reach a selection.
+_LAST_MONTH_LIMIT = 1024
+
+
+# Keyboards are assembled from callback data the picker generates and labels
+# checked once in __init__, so the models are created with `model_construct`
+# to skip pydantic validation.
+def _button(text: str, callback_data: str) -> InlineKeyboardButton:
+    return InlineKeyboardButton.model_construct(text=text, callback_data=callback_data)
+
+
+def _markup(
+    inline_keyboard: list[list[InlineKeyboardButton]],
+) -> InlineKeyboardMarkup:
+    return InlineKeyboardMarkup.model_construct(inline_keyboard=inline_keyboard)
+
 
 class DatePicker:
+    __slots__ = (
+        "mode",
+        "date_format",
+        "return_as",
+        "start_date",
+        "end_date",
+        "on_date_selected",
+        "prefix",
+        "_callback_prefix",
+        "_prefix_len",
+        "months",
+        "days",
+        "prompt_select_date",
+        "prompt_select_year",
+        "prompt_select_month_fmt",
+        "prompt_select_day_fmt",
+        "button_today",
+        "router",
+        "_spacer",
+        "_day_header_row",
+        "_select_cb",
+        "_nav_cb",
+        "_decode_cb",
+        "_month_dates",
+        "_header_text",
+        "_month_meta",
+        "_month_status",
+        "_is_iso_fmt",
+        "_fmt_cache",
+        "_min_month",
+        "_max_month",
+        "_inline_cache",
+        "_inline_cache_day",
+        "_day_cache",
+        "_year_markup",
+        "_month_markups",
+        "_last_month",
+    )
+
     def __init__(
         self,
         *,
@@ -64,6 +127,8 @@ class DatePicker:
             Defaults to Russian month names.
         day_names (Optional[list[str]], optional): List of 7 weekday abbreviations
             (starting from Monday). Defaults to Russian short names ("Пн", "Вт", etc.).
+            Both lists are checked once here; `ValueError` is raised if they have
+            the wrong length or contain non-string items.
         prompt_select_date (str, optional): Prompt text for inline mode.
             Defaults to "Выберите дату:".
         prompt_select_year (str, optional): Prompt when selecting a year in step mode.
@@ -97,6 +162,7 @@ class DatePicker:
         self.on_date_selected = on_date_selected
         self.prefix = prefix
         self._callback_prefix = f"{prefix}:"
+        self._prefix_len = len(self._callback_prefix)
         self.months = month_names or [
             "Январь",
             "Февраль",
@@ -112,103 +178,250 @@ class DatePicker:
             "Декабрь",
         ]
         self.days = day_names or ["Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс"]
+        if len(self.months) != 12 or not all(isinstance(m, str) for m in self.months):
+            raise ValueError("month_names must be a list of 12 strings")
+        if len(self.days) != 7 or not all(isinstance(d, str) for d in self.days):
+            raise ValueError("day_names must be a list of 7 strings")
         self.prompt_select_date = prompt_select_date
         self.prompt_select_year = prompt_select_year
         self.prompt_select_month_fmt = prompt_select_month_fmt
         self.prompt_select_day_fmt = prompt_select_day_fmt
         self.button_today = button_today
 
+        self._spacer = _button(text=" ", callback_data="noop")
+        self._day_header_row = [
+            _button(text=d, callback_data="noop") for d in self.days
+        ]
+
+        # Per-month tables, filled the first time an in-range month is rendered
+        # so that construction cost does not grow with the length of the range.
+        self._month_meta: dict[tuple[int, int], tuple[int, int]] = {}
+        self._month_status: dict[tuple[int, int], int] = {}
+        self._month_dates: dict[tuple[int, int], list[date]] = {}
+        self._header_text: dict[tuple[int, int], str] = {}
+        self._select_cb: dict[date, str] = {}
+        self._nav_cb: dict[date, str] = {}
+        self._decode_cb: dict[str, date] = {}
+        self._is_iso_fmt = date_format == "%Y-%m-%d"
+        self._fmt_cache: dict[date, str] = {}
+
+        # Only months within the range are cached; callback data is client
+        # controlled, so anything outside it is rendered without being stored.
+        self._min_month = (self.start_date.year, self.start_date.month)
+        self._max_month = (self.end_date.year, self.end_date.month)
+        self._inline_cache: dict[tuple[int, int], InlineKeyboardMarkup] = {}
+        self._inline_cache_day: Optional[date] = None
+        self._day_cache: dict[tuple[int, int], InlineKeyboardMarkup] = {}
+        # chat id -> (message id, year, month) of the last inline calendar shown
+        self._last_month: dict[int, tuple[int, int, int]] = {}
+        self._year_markup: Optional[InlineKeyboardMarkup] = None
+        self._month_markups: dict[int, InlineKeyboardMarkup] = {}
+        if mode == "step":
+            self._year_markup = self._build_year_keyboard()
+            years = range(self.start_date.year, self.end_date.year + 1)
+            if len(years) <= _PREBUILT_YEARS_LIMIT:
+                self._month_markups = {y: self._render_month_keyboard(y) for y in years}
+
         self.router = Router()
         self.router.callback_query.register(
             self._handle_callback, F.data.startswith(self._callback_prefix)
         )
 
+    def _classify_month(self, year: int, month: int) -> int:
+        first_day = date(year, month, 1)
+        last_day = date(year, month, self._month_info(year, month)[1])
+        if last_day < self.start_date or first_day > self.end_date:
+            return _MONTH_OUTSIDE
+        if self.start_date <= first_day and last_day <= self.end_date:
+            return _MONTH_INSIDE
+        return _MONTH_PARTIAL
+
+    def _month_state(self, year: int, month: int) -> int:
+        key = (year, month)
+        status = self._month_status.get(key)
+        if status is None:
+            status = self._classify_month(year, month)
+            if self._min_month <= key <= self._max_month:
+                self._month_status[key] = status
+        return status
+
+    def _month_info(self, year: int, month: int) -> tuple[int, int]:
+        key = (year, month)
+        meta = self._month_meta.get(key)
+        if meta is None:
+            meta = calendar.monthrange(year, month)
+            if self._min_month <= key <= self._max_month:
+                self._month_meta[key] = meta
+        return meta
+
+    def _month_days(self, year: int, month: int) -> list[date]:
+        key = (year, month)
+        dates = self._month_dates.get(key)
+        if dates is None:
+            days_in_month = self._month_info(year, month)[1]
+            dates = [date(year, month, day) for day in range(1, days_in_month + 1)]
+            if self._min_month <= key <= self._max_month:
+                self._month_dates[key] = dates
+                self._fill_month(dates)
+        return dates
+
+    def _fill_month(self, dates: list[date]) -> None:
+        with_fmt = self.return_as == "str"
+        for d in dates:
+            if self.start_date <= d <= self.end_date:
+                iso = d.isoformat()
+                self._select_cb[d] = self._encode("select", iso)
+                self._decode_cb[iso] = d
+                if with_fmt:
+                    self._fmt_cache[d] = (
+                        iso if self._is_iso_fmt else d.strftime(self.date_format)
+                    )
+
+    def _select_callback(self, d: date) -> str:
+        self._month_days(d.year, d.month)
+        return self._select_cb[d]
+
+    def _nav_callback(self, first_day: date) -> str:
+        data = self._nav_cb.get(first_day)
+        if data is None:
+            iso = first_day.isoformat()
+            data = self._encode("nav", iso)
+            if self._min_month <= (first_day.year, first_day.month) <= self._max_month:
+                self._nav_cb[first_day] = data
+                self._decode_cb[iso] = first_day
+        return data
+
+    def _format_header(self, year: int, month: int) -> str:
+        return f"{self.months[month - 1]} {year}"
+
     def _encode(self, action: str, value: str = "") -> str:
         return f"{self.prefix}:{action}:{value}"
 
+    def _decode_date(self, value: str) -> date:
+        decoded = self._decode_cb.get(value)
+        if decoded is None:
+            decoded = date.fromisoformat(value)
+        return decoded
+
+    @classmethod
+    def shared_router(cls, *pickers: "DatePicker") -> Router:
+        """Build one router that serves callbacks of all given pickers.
+
+        Callbacks are dispatched with a single dict lookup by prefix instead
+        of one filter per picker. A new router is returned on every call, so
+        include it once per dispatcher in place of the pickers' own routers.
+
+        Raises:
+            ValueError: If a prefix contains ":" or is used by two pickers.
+        """
+        pickers_by_prefix: dict[str, DatePicker] = {}
+        for picker in pickers:
+            if ":" in picker.prefix:
+                raise ValueError(
+                    f"prefix must not contain ':' in a shared router, "
+                    f"got {picker.prefix!r}"
+                )
+            if picker.prefix in pickers_by_prefix:
+                raise ValueError(f"prefix {picker.prefix!r} is used more than once")
+            pickers_by_prefix[picker.prefix] = picker
+
+        def match_picker(callback: CallbackQuery) -> dict | bool:
+            prefix, sep, _ = (callback.data or "").partition(":")
+            picker = pickers_by_prefix.get(prefix) if sep else None
+            if picker is None:
+                return False
+            return {"date_picker": picker}
+
+        router = Router()
+        router.callback_query.register(cls._dispatch, match_picker)
+        return router
+
+    @staticmethod
+    async def _dispatch(
+        callback: CallbackQuery, state: FSMContext, date_picker: "DatePicker"
+    ):
+        await date_picker._handle_callback(callback, state)
+
     def get_router(self) -> Router:
         return self.router
 
     async def start(self, message: Message, state: FSMContext) -> None:
         if self.mode == "inline":
             markup = self._build_inline_calendar(self.start_date)
-            await message.answer(self.prompt_select_date, reply_markup=markup)
+            sent = await message.answer(self.prompt_select_date, reply_markup=markup)
+            self._remember_month(
+                sent.chat.id,
+                (sent.message_id, self.start_date.year, self.start_date.month),
+            )
         elif self.mode == "step":
-            markup = self._build_year_keyboard()
-            await message.answer(self.prompt_select_year, reply_markup=markup)
+            await message.answer(
+                self.prompt_select_year, reply_markup=self._year_markup
+            )
+
+    def _remember_month(self, chat_id: int, shown: tuple[int, int, int]) -> None:
+        last_month = self._last_month
+        last_month.pop(chat_id, None)
+        if len(last_month) >= _LAST_MONTH_LIMIT:
+            # Dicts keep insertion order, so the first key is the oldest entry.
+            del last_month[next(iter(last_month))]
+        last_month[chat_id] = shown
 
     def _build_inline_calendar(self, current: date) -> InlineKeyboardMarkup:
+        # The "today" button depends on the current date, so the cache is
+        # only valid until the day rolls over.
+        today = date.today()
+        if self._inline_cache_day != today:
+            self._inline_cache.clear()
+            self._inline_cache_day = today
+        key = (current.year, current.month)
+        markup = self._inline_cache.get(key)
+        if markup is None:
+            markup = self._render_inline_calendar(current, today)
+            if self._min_month <= key <= self._max_month:
+                self._inline_cache[key] = markup
+        return markup
+
+    def _render_inline_calendar(
+        self, current: date, today: date
+    ) -> InlineKeyboardMarkup:
         kb = []
-        kb.append(
-            [InlineKeyboardButton(text=current.strftime("%B %Y"), callback_data="noop")]
-        )
-        kb.append(
-            [InlineKeyboardButton(text=d, callback_data="noop") for d in self.days]
-        )
+        key = (current.year, current.month)
+        header = self._header_text.get(key)
+        if header is None:
+            header = self._format_header(current.year, current.month)
+            if self._min_month <= key <= self._max_month:
+                self._header_text[key] = header
+        kb.append([_button(text=header, callback_data="noop")])
+        kb.append(self._day_header_row)
 
         first_day = current.replace(day=1)
-        start_offset = first_day.weekday()
-        days_in_month = calendar.monthrange(current.year, current.month)[1]
-
-        week = []
-        for _ in range(start_offset):
-            week.append(InlineKeyboardButton(text=" ", callback_data="noop"))
-
-        for day in range(1, days_in_month + 1):
-            d = current.replace(day=day)
-            if self.start_date <= d <= self.end_date:
-                week.append(
-                    InlineKeyboardButton(
-                        text=str(day),
-                        callback_data=self._encode("select", d.isoformat()),
-                    )
-                )
-            else:
-                week.append(InlineKeyboardButton(text=str(day), callback_data="noop"))
-            if len(week) == 7:
-                kb.append(week)
-                week = []
-
-        if week:
-            while len(week) < 7:
-                week.append(InlineKeyboardButton(text=" ", callback_data="noop"))
-            kb.append(week)
+        kb.extend(self._build_day_rows(current.year, current.month))
 
         prev_month = (first_day - timedelta(days=1)).replace(day=1)
         next_month = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
         nav = []
         if prev_month >= self.start_date.replace(day=1):
-            nav.append(
-                InlineKeyboardButton(
-                    text="◀️", callback_data=self._encode("nav", prev_month.isoformat())
-                )
-            )
+            nav.append(_button(text="◀️", callback_data=self._nav_callback(prev_month)))
         else:
-            nav.append(InlineKeyboardButton(text=" ", callback_data="noop"))
+            nav.append(self._spacer)
 
-        today = date.today()
         if self.start_date <= today <= self.end_date:
-            print(str(date.today()))
             nav.append(
-                InlineKeyboardButton(
-                    text=str(date.today()),
-                    callback_data=self._encode("select", today.isoformat()),
+                _button(
+                    text=str(today),
+                    callback_data=self._select_callback(today),
                 )
             )
         else:
-            nav.append(InlineKeyboardButton(text=" ", callback_data="noop"))
+            nav.append(self._spacer)
 
         if next_month <= self.end_date.replace(day=1):
-            nav.append(
-                InlineKeyboardButton(
-                    text="▶️", callback_data=self._encode("nav", next_month.isoformat())
-                )
-            )
+            nav.append(_button(text="▶️", callback_data=self._nav_callback(next_month)))
         else:
-            nav.append(InlineKeyboardButton(text=" ", callback_data="noop"))
+            nav.append(self._spacer)
 
         kb.append(nav)
-        return InlineKeyboardMarkup(inline_keyboard=kb)
+        return _markup(kb)
 
     def _build_year_keyboard(self) -> InlineKeyboardMarkup:
         min_year = self.start_date.year
@@ -224,30 +437,32 @@ class DatePicker:
             row = []
             for y in years[i : i + 3]:
                 row.append(
-                    InlineKeyboardButton(
+                    _button(
                         text=str(y), callback_data=self._encode("select_year", str(y))
                     )
                 )
             buttons.append(row)
-        return InlineKeyboardMarkup(inline_keyboard=buttons)
+        return _markup(buttons)
 
     def _build_month_keyboard(self, year: int) -> InlineKeyboardMarkup:
+        markup = self._month_markups.get(year)
+        if markup is None:
+            markup = self._render_month_keyboard(year)
+            if self.start_date.year <= year <= self.end_date.year:
+                self._month_markups[year] = markup
+        return markup
+
+    def _render_month_keyboard(self, year: int) -> InlineKeyboardMarkup:
         buttons = []
         for i in range(0, 12, 3):
             row = []
             for m in range(i, min(i + 3, 12)):
                 month_num = m + 1
-                first_day = date(year, month_num, 1)
-                last_day = date(
-                    year, month_num, calendar.monthrange(year, month_num)[1]
-                )
-                if not (self.start_date <= last_day and first_day <= self.end_date):
-                    row.append(
-                        InlineKeyboardButton(text=self.months[m], callback_data="noop")
-                    )
+                if self._month_state(year, month_num) == _MONTH_OUTSIDE:
+                    row.append(_button(text=self.months[m], callback_data="noop"))
                 else:
                     row.append(
-                        InlineKeyboardButton(
+                        _button(
                             text=self.months[m],
                             callback_data=self._encode(
                                 "select_month", f"{year}-{month_num}"
@@ -255,61 +470,75 @@ class DatePicker:
                         )
                     )
             buttons.append(row)
-        return InlineKeyboardMarkup(inline_keyboard=buttons)
+        return _markup(buttons)
 
     def _build_day_keyboard(self, year: int, month: int) -> InlineKeyboardMarkup:
-        days_in_month = calendar.monthrange(year, month)[1]
+        key = (year, month)
+        markup = self._day_cache.get(key)
+        if markup is None:
+            markup = self._render_day_keyboard(year, month)
+            if self._min_month <= key <= self._max_month:
+                self._day_cache[key] = markup
+        return markup
+
+    def _render_day_keyboard(self, year: int, month: int) -> InlineKeyboardMarkup:
         buttons = []
         header = f"{year}-{month:02d}"
-        buttons.append([InlineKeyboardButton(text=header, callback_data="noop")])
-        buttons.append(
-            [InlineKeyboardButton(text=d, callback_data="noop") for d in self.days]
-        )
-
-        first_weekday = calendar.monthrange(year, month)[0]
-        week = [
-            InlineKeyboardButton(text=" ", callback_data="noop")
-            for _ in range(first_weekday)
-        ]
-
-        for day in range(1, days_in_month + 1):
-            d = date(year, month, day)
-            if self.start_date <= d <= self.end_date:
-                week.append(
-                    InlineKeyboardButton(
-                        text=str(day),
-                        callback_data=self._encode("select", d.isoformat()),
-                    )
+        buttons.append([_button(text=header, callback_data="noop")])
+        buttons.append(self._day_header_row)
+
+        buttons.extend(self._build_day_rows(year, month))
+        return _markup(buttons)
+
+    def _build_day_rows(
+        self, year: int, month: int
+    ) -> list[list[InlineKeyboardButton]]:
+        dates = self._month_days(year, month)
+        status = self._month_state(year, month)
+        cells = [self._spacer] * self._month_info(year, month)[0]
+        if status == _MONTH_INSIDE:
+            cells += [
+                _button(text=str(d.day), callback_data=self._select_cb[d])
+                for d in dates
+            ]
+        elif status == _MONTH_OUTSIDE:
+            cells += [_button(text=str(d.day), callback_data="noop") for d in dates]
+        else:
+            cells += [
+                _button(
+                    text=str(d.day),
+                    callback_data=(
+                        self._select_cb[d]
+                        if self.start_date <= d <= self.end_date
+                        else "noop"
+                    ),
                 )
-            else:
-                week.append(InlineKeyboardButton(text=str(day), callback_data="noop"))
-            if len(week) == 7:
-                buttons.append(week)
-                week = []
-
-        if week:
-            while len(week) < 7:
-                week.append(InlineKeyboardButton(text=" ", callback_data="noop"))
-            buttons.append(week)
-
-        return InlineKeyboardMarkup(inline_keyboard=buttons)
+                for d in dates
+            ]
+        cells += [self._spacer] * (-len(cells) % 7)
+        return [cells[i : i + 7] for i in range(0, len(cells), 7)]
 
     async def _handle_callback(self, callback: CallbackQuery, state: FSMContext):
         await callback.answer()
         data = callback.data
 
-        if not data.startswith(self._callback_prefix):
-            return
-        payload = data[len(self._callback_prefix) :]
-        parts = payload.split(":", 1)
-        action = parts[0]
-        value = parts[1] if len(parts) > 1 else ""
+        # Routers only dispatch callbacks carrying our prefix.
+        action, _, value = data[self._prefix_len :].partition(":")
 
         if self.mode == "inline":
             if action == "nav":
-                new_date = date.fromisoformat(value)
+                new_date = self._decode_date(value)
+                message = callback.message
+                shown = (message.message_id, new_date.year, new_date.month)
+                if self._last_month.get(message.chat.id) == shown:
+                    return
                 markup = self._build_inline_calendar(new_date)
-                await callback.message.edit_reply_markup(reply_markup=markup)
+                try:
+                    await message.edit_reply_markup(reply_markup=markup)
+                except TelegramBadRequest as e:
+                    if "message is not modified" not in e.message:
+                        raise
+                self._remember_month(message.chat.id, shown)
             elif action == "select":
                 await self._finalize_selection(callback, state, value)
 
@@ -332,13 +561,17 @@ class DatePicker:
     async def _finalize_selection(
         self, callback: CallbackQuery, state: FSMContext, iso_date: str
     ):
-        selected = date.fromisoformat(iso_date)
-        result = (
-            selected
-            if self.return_as == "date"
-            else selected.strftime(self.date_format)
-        )
+        selected = self._decode_date(iso_date)
+        if self.return_as == "date":
+            result = selected
+        else:
+            # Dates outside the table (e.g. non-canonical ISO forms accepted by
+            # the fallback parser) are formatted explicitly to stay normalized.
+            result = self._fmt_cache.get(selected)
+            if result is None:
+                result = selected.strftime(self.date_format)
         await callback.message.delete()
+        self._last_month.pop(callback.message.chat.id, None)
         await state.update_data(selected_date=result)
         if self.on_date_selected:
             await self.on_date_selected(result, callback)
@@ -72,8 +72,7 @@ date_picker_step = DatePicker(
     on_date_selected=handle_selected_date,
 )
 
-dp.include_router(date_picker_inline.get_router())
-dp.include_router(date_picker_step.get_router())
+dp.include_router(DatePicker.shared_router(date_picker_inline, date_picker_step))
 
 
 @dp.message(Command("date1"))
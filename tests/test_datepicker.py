@@ -0,0 +1,217 @@
+import asyncio
+import importlib
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+from aiogram.exceptions import TelegramBadRequest
+
+from aiogram_datepicker import DatePicker
+
+picker_module = importlib.import_module("aiogram_datepicker.DatePicker")
+
+# Per-month tables that must never hold entries for months outside the range.
+MONTH_TABLES = (
+    "_inline_cache",
+    "_day_cache",
+    "_month_meta",
+    "_month_status",
+    "_header_text",
+    "_month_dates",
+    "_nav_cb",
+    "_select_cb",
+    "_decode_cb",
+    "_fmt_cache",
+)
+
+
+class FakeDate(date):
+    current = date(2025, 3, 10)
+
+    @classmethod
+    def today(cls):
+        return cls.current
+
+
+@pytest.fixture
+def fake_today(monkeypatch):
+    monkeypatch.setattr(picker_module, "date", FakeDate)
+
+    def set_today(value: date) -> None:
+        monkeypatch.setattr(FakeDate, "current", value)
+
+    return set_today
+
+
+def make_picker(prefix: str, **kwargs) -> DatePicker:
+    kwargs.setdefault("start_date", date(2025, 1, 1))
+    kwargs.setdefault("end_date", date(2025, 12, 31))
+    return DatePicker(prefix=prefix, **kwargs)
+
+
+class FakeMessage:
+    def __init__(self, chat_id: int = 1, message_id: int = 10):
+        self.chat = SimpleNamespace(id=chat_id)
+        self.message_id = message_id
+        self.edits = []
+
+    async def edit_reply_markup(self, reply_markup=None):
+        self.edits.append(reply_markup)
+
+    async def edit_text(self, text, reply_markup=None):
+        self.edits.append(reply_markup)
+
+    async def delete(self):
+        pass
+
+
+class FailingMessage(FakeMessage):
+    def __init__(self, error: str):
+        super().__init__()
+        self.error = error
+
+    async def edit_reply_markup(self, reply_markup=None):
+        raise TelegramBadRequest(method=None, message=self.error)
+
+
+class FakeState:
+    def __init__(self):
+        self.data = {}
+
+    async def update_data(self, **kwargs):
+        self.data.update(kwargs)
+
+
+def run_callback(picker: DatePicker, data: str, message=None) -> FakeState:
+    async def answer():
+        pass
+
+    callback = SimpleNamespace(
+        data=data, message=message or FakeMessage(), answer=answer
+    )
+    state = FakeState()
+    asyncio.run(picker._handle_callback(callback, state))
+    return state
+
+
+def test_inline_cache_resets_when_day_rolls_over(fake_today):
+    fake_today(date(2025, 3, 10))
+    picker = make_picker("rollover")
+    first = picker._build_inline_calendar(date(2025, 3, 1))
+    assert picker._build_inline_calendar(date(2025, 3, 1)) is first
+
+    fake_today(date(2025, 3, 11))
+    second = picker._build_inline_calendar(date(2025, 3, 1))
+
+    assert second is not first
+    today_button = second.inline_keyboard[-1][1]
+    assert today_button.text == "2025-03-11"
+    assert today_button.callback_data == "rollover:select:2025-03-11"
+
+
+@pytest.mark.parametrize("rendered", [True, False])
+@pytest.mark.parametrize("value", ["2025-03-04", "20250304", "2025-W10-2"])
+def test_str_result_is_normalized(value, rendered):
+    picker = make_picker(f"normalize_{value}_{rendered}", return_as="str")
+    if rendered:
+        picker._build_inline_calendar(date(2025, 3, 1))
+
+    state = run_callback(picker, f"{picker.prefix}:select:{value}")
+
+    assert state.data == {"selected_date": "2025-03-04"}
+
+
+@pytest.mark.parametrize(
+    "labels",
+    [
+        {"month_names": ["Jan"] * 11},
+        {"month_names": ["Jan"] * 11 + [12]},
+        {"day_names": ["Mo"] * 6},
+        {"day_names": ["Mo"] * 6 + [None]},
+    ],
+)
+def test_invalid_labels_are_rejected(labels):
+    with pytest.raises(ValueError):
+        make_picker("labels", **labels)
+
+
+def test_header_uses_month_names():
+    names = [f"M{i}" for i in range(1, 13)]
+    picker = make_picker("header", month_names=names)
+
+    markup = picker._build_inline_calendar(date(2025, 4, 1))
+
+    assert markup.inline_keyboard[0][0].text == "M4 2025"
+
+
+def test_step_mode_prebuilds_short_ranges_only():
+    short = make_picker("prebuild_short", mode="step", end_date=date(2027, 6, 30))
+    long = make_picker("prebuild_long", mode="step", start_date=date(1900, 1, 1))
+
+    assert short._year_markup is not None
+    assert list(short._month_markups) == [2025, 2026, 2027]
+    assert long._year_markup is not None
+    assert long._month_markups == {}
+
+
+def test_out_of_range_months_are_not_cached():
+    picker = make_picker("out_of_range")
+    for year in range(1000, 1010):
+        picker._build_month_keyboard(year)
+        for month in range(1, 13):
+            run_callback(picker, f"out_of_range:nav:{year}-{month:02d}-01")
+            picker._build_day_keyboard(year, month)
+
+    for name in MONTH_TABLES:
+        assert getattr(picker, name) == {}, name
+    assert picker._month_markups == {}
+
+    picker._build_inline_calendar(date(2025, 5, 1))
+    picker._build_day_keyboard(2025, 5)
+    picker._build_month_keyboard(2025)
+    assert list(picker._inline_cache) == [(2025, 5)]
+    assert list(picker._day_cache) == [(2025, 5)]
+    assert list(picker._month_markups) == [2025]
+
+
+def test_repeated_nav_to_shown_month_is_skipped():
+    picker = make_picker("skip_nav")
+    message = FakeMessage()
+
+    run_callback(picker, "skip_nav:nav:2025-04-01", message)
+    run_callback(picker, "skip_nav:nav:2025-04-01", message)
+    assert len(message.edits) == 1
+
+    other = FakeMessage(message_id=11)
+    run_callback(picker, "skip_nav:nav:2025-04-01", other)
+    assert len(other.edits) == 1
+
+
+def test_not_modified_error_is_swallowed():
+    picker = make_picker("not_modified")
+
+    run_callback(
+        picker,
+        "not_modified:nav:2025-04-01",
+        FailingMessage("Bad Request: message is not modified"),
+    )
+    assert picker._last_month[1] == (10, 2025, 4)
+
+    with pytest.raises(TelegramBadRequest):
+        run_callback(
+            picker,
+            "not_modified:nav:2025-05-01",
+            FailingMessage("Bad Request: message to edit not found"),
+        )
+
+
+def test_last_month_is_bounded(monkeypatch):
+    monkeypatch.setattr(picker_module, "_LAST_MONTH_LIMIT", 3)
+    picker = make_picker("bounded")
+
+    for chat_id in range(5):
+        run_callback(picker, "bounded:nav:2025-04-01", FakeMessage(chat_id=chat_id))
+    assert list(picker._last_month) == [2, 3, 4]
+
+    run_callback(picker, "bounded:select:2025-04-02", FakeMessage(chat_id=4))
+    assert list(picker._last_month) == [2, 3]
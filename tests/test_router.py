@@ -0,0 +1,159 @@
+import asyncio
+import gc
+from datetime import date, datetime
+
+import pytest
+from aiogram import Bot, Dispatcher, Router
+from aiogram.client.session.base import BaseSession
+from aiogram.types import CallbackQuery, Chat, Message, Update, User
+
+from aiogram_datepicker import DatePicker
+
+
+class FakeSession(BaseSession):
+    async def make_request(self, bot, method, timeout=None):
+        return True
+
+    async def stream_content(self, *args, **kwargs):
+        yield b""
+
+    async def close(self):
+        pass
+
+
+def make_update(update_id: int, data: str) -> Update:
+    chat = Chat(id=1, type="private")
+    message = Message(message_id=10, date=datetime.now(), chat=chat)
+    return Update(
+        update_id=update_id,
+        callback_query=CallbackQuery(
+            id=str(update_id),
+            from_user=User(id=1, is_bot=False, first_name="user"),
+            chat_instance="chat",
+            data=data,
+            message=message,
+        ),
+    )
+
+
+def fallback_router(seen: list) -> Router:
+    router = Router()
+
+    @router.callback_query()
+    async def fallback(callback: CallbackQuery):
+        seen.append(callback.data)
+
+    return router
+
+
+def make_picker(prefix: str, selected: list) -> DatePicker:
+    async def on_date_selected(value, callback):
+        selected.append((prefix, value))
+
+    return DatePicker(
+        start_date=date(2025, 1, 1),
+        end_date=date(2025, 12, 31),
+        on_date_selected=on_date_selected,
+        prefix=prefix,
+    )
+
+
+def feed(dp: Dispatcher, *data: str) -> None:
+    bot = Bot("42:TEST", session=FakeSession())
+
+    async def run():
+        for update_id, value in enumerate(data):
+            await dp.feed_update(bot, make_update(update_id, value))
+
+    asyncio.run(run())
+
+
+def test_each_picker_router_can_be_included():
+    selected = []
+    first = make_picker("router_a", selected)
+    second = make_picker("router_b", selected)
+    dp = Dispatcher()
+    dp.include_router(first.get_router())
+    dp.include_router(second.get_router())
+
+    feed(dp, "router_a:select:2025-03-04", "router_b:select:2025-05-06")
+
+    assert selected == [
+        ("router_a", date(2025, 3, 4)),
+        ("router_b", date(2025, 5, 6)),
+    ]
+    assert first.router is first.get_router()
+
+
+def test_picker_router_is_scoped_to_its_prefix():
+    selected, other = [], []
+    included = make_picker("scoped_a", selected)
+    make_picker("scoped_b", selected)
+    dp = Dispatcher()
+    dp.include_router(included.get_router())
+    dp.include_router(fallback_router(other))
+
+    feed(dp, "scoped_b:select:2025-03-04", "scoped_a:select:2025-05-06")
+
+    assert selected == [("scoped_a", date(2025, 5, 6))]
+    assert other == ["scoped_b:select:2025-03-04"]
+
+
+def test_picker_router_keeps_picker_alive():
+    selected = []
+    dp = Dispatcher()
+    dp.include_router(make_picker("alive", selected).get_router())
+    gc.collect()
+
+    feed(dp, "alive:select:2025-03-04")
+
+    assert selected == [("alive", date(2025, 3, 4))]
+
+
+def test_same_prefix_in_two_dispatchers():
+    selected = []
+    for day in (3, 4):
+        dp = Dispatcher()
+        dp.include_router(make_picker("dp", selected).get_router())
+        feed(dp, f"dp:select:2025-03-0{day}")
+
+    assert selected == [("dp", date(2025, 3, 3)), ("dp", date(2025, 3, 4))]
+
+
+def test_shared_router_per_dispatcher():
+    selected = []
+    first = make_picker("shared_a", selected)
+    second = make_picker("shared_b", selected)
+    for _ in range(2):
+        dp = Dispatcher()
+        dp.include_router(DatePicker.shared_router(first, second))
+        feed(dp, "shared_a:select:2025-07-08", "shared_b:select:2025-07-09")
+
+    expected = [("shared_a", date(2025, 7, 8)), ("shared_b", date(2025, 7, 9))]
+    assert selected == expected * 2
+
+
+@pytest.mark.parametrize("shared", [False, True])
+def test_foreign_callbacks_fall_through(shared):
+    selected, other = [], []
+    picker = make_picker("foreign_a", selected)
+    dp = Dispatcher()
+    if shared:
+        dp.include_router(DatePicker.shared_router(picker))
+    else:
+        dp.include_router(picker.get_router())
+    dp.include_router(fallback_router(other))
+
+    feed(dp, "menu:open", "foreign_a:select:2025-02-03", "noop")
+
+    assert selected == [("foreign_a", date(2025, 2, 3))]
+    assert other == ["menu:open", "noop"]
+
+
+def test_shared_router_prefix_validation():
+    with pytest.raises(ValueError):
+        DatePicker.shared_router(make_picker("twice", []), make_picker("twice", []))
+    with pytest.raises(ValueError):
+        DatePicker.shared_router(make_picker("with:colon", []))
+
+    DatePicker.shared_router(make_picker("twice", []), make_picker("once", []))